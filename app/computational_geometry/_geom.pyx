@@ -0,0 +1,32 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+# Compiled shoelace + bounds kernel; build with scripts/build_geom.sh.
+# polygon_geometry.shoelace_and_bbox falls back to Numba/NumPy without it.
+
+
+def shoelace_bounds(const double[:, ::1] pts):
+    """Return (signed_area, x_min, y_min, x_max, y_max) of an (N, 2)
+    C-contiguous float64 polygon in a single pass."""
+    cdef Py_ssize_t i, n = pts.shape[0]
+    cdef double area = 0.0
+    cdef double x, y, x_prev, y_prev, x_min, y_min, x_max, y_max
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    x_prev = pts[n - 1, 0]
+    y_prev = pts[n - 1, 1]
+    x_min = x_max = pts[0, 0]
+    y_min = y_max = pts[0, 1]
+    for i in range(n):
+        x = pts[i, 0]
+        y = pts[i, 1]
+        area += x_prev * y - x * y_prev
+        if x < x_min:
+            x_min = x
+        elif x > x_max:
+            x_max = x
+        if y < y_min:
+            y_min = y
+        elif y > y_max:
+            y_max = y
+        x_prev = x
+        y_prev = y
+    return 0.5 * area, x_min, y_min, x_max, y_max
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Tuple
 
 from PySide6.QtCore import QRectF, QPointF
+from PySide6.QtGui import QTransform
 
 
 def compute_video_rect(img_w: int, img_h: int, widget_w, widget_h) -> QRectF:
@@ -78,3 +79,10 @@ def image_to_widget_coords(x_img: float, y_img: float,
     x_widget = rect.x() + x_rel * rect.width()
     y_widget = rect.y() + y_rel * rect.height()
     return QPointF(x_widget, y_widget)
+
+
+def normalized_to_widget_transform(rect: QRectF) -> QTransform:
+    """Transform mapping normalized [0..1] image coordinates into `rect`
+    (widget coordinates), so whole polygons can be mapped in one call."""
+    return QTransform(rect.width(), 0.0, 0.0, rect.height(),
+                      rect.left(), rect.top())
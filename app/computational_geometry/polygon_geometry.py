@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Tuple
+
+import numpy as np
+
+try:
+    # optional compiled kernel, see scripts/build_geom.sh
+    from app.computational_geometry._geom import shoelace_bounds
+except ImportError:
+    shoelace_bounds = None
+
+if shoelace_bounds is None:
+    try:
+        import numba
+    except ImportError:  # optional: fall back to the NumPy implementation
+        numba = None
+else:
+    numba = None  # the C extension needs no JIT warm-up
+
+
+def _shoelace_and_bbox_numpy(xy: np.ndarray) -> Tuple[float, float, float,
+                                                     float, float]:
+    x, y = xy[:, 0], xy[:, 1]
+    area = 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+    x_min, y_min = xy.min(axis=0)
+    x_max, y_max = xy.max(axis=0)
+    return area, float(x_min), float(y_min), float(x_max), float(y_max)
+
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _shoelace_and_bbox_jit(xy):
+        # single pass: no np.roll temporaries, area and bounds fused
+        n = xy.shape[0]
+        x_prev = xy[n - 1, 0]
+        y_prev = xy[n - 1, 1]
+        x_min = x_max = xy[0, 0]
+        y_min = y_max = xy[0, 1]
+        area = 0.0
+        for i in range(n):
+            x = xy[i, 0]
+            y = xy[i, 1]
+            area += x_prev * y - x * y_prev
+            if x < x_min:
+                x_min = x
+            elif x > x_max:
+                x_max = x
+            if y < y_min:
+                y_min = y
+            elif y > y_max:
+                y_max = y
+            x_prev = x
+            y_prev = y
+        return 0.5 * area, x_min, y_min, x_max, y_max
+
+    _shoelace_and_bbox_impl = _shoelace_and_bbox_jit
+elif shoelace_bounds is not None:
+    _shoelace_and_bbox_impl = shoelace_bounds
+else:
+    _shoelace_and_bbox_impl = _shoelace_and_bbox_numpy
+
+
+def shoelace_and_bbox(points) -> Tuple[float, float, float, float, float]:
+    """Return (signed_area, x_min, y_min, x_max, y_max) of a polygon.
+
+    `points` is anything convertible to an (N, 2) float array. Uses the
+    compiled _geom extension if built, else a Numba kernel when numba is
+    installed, else NumPy.
+    """
+    xy = np.ascontiguousarray(points, dtype=np.float64)
+    if len(xy) == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    return _shoelace_and_bbox_impl(xy)
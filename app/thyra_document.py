@@ -1,6 +1,9 @@
+import copy
+import itertools
 import json
 import os
-from typing import List
+import tempfile
+from typing import Iterable, List
 from dataclasses import dataclass, field
 from dataclasses_json import dataclass_json, config
 
@@ -9,6 +12,50 @@ from app.ui.polygone_shape import PolygonShape
 from app.ui.vector_masks import vector_masks_encoder, vector_masks_decoder, \
     VectorMask
 
+JSON_COMPACT = (",", ":")
+
+# Process umask, read once at import: os.umask can only be queried by
+# setting it, which would race with files created by other threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _stream_coco(out_path: str, images: List[dict],
+                 annotations: Iterable[dict], categories: List[dict]):
+    """Write a COCO file, encoding annotations one at a time so peak memory
+    stays at a single annotation rather than the whole document.
+
+    Annotations are generated while writing, so the output goes to a
+    temporary file that only replaces `out_path` once complete; a failing
+    mask leaves any previous export intact."""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(out_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write('{"images":')
+            f.write(json.dumps(images, separators=JSON_COMPACT))
+            f.write(',"annotations":[')
+            first = True
+            for ann in annotations:
+                if not first:
+                    f.write(",")
+                f.write(json.dumps(ann, separators=JSON_COMPACT))
+                first = False
+            f.write('],"categories":')
+            f.write(json.dumps(categories, separators=JSON_COMPACT))
+            f.write("}\n")
+        # mkstemp creates the file owner-only; give it the mode open(..., "w")
+        # would have, or keep the mode of the export being replaced
+        try:
+            mode = os.stat(out_path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 
 @dataclass_json
 @dataclass
@@ -24,6 +71,15 @@ class ThyraDocument:
 
     def __post_init__(self):
         self.action_stack: List[VectorMask] = []
+        # sequential mask IDs, continuing after numeric IDs already present
+        # (documents saved earlier may hold UUID strings, which are skipped)
+        self._mask_ids = itertools.count(1 + max(
+            (int(m.id) for m in self.vector_masks if str(m.id).isdigit()),
+            default=0))
+
+    def new_mask_id(self) -> str:
+        """Return the next unique mask ID for this document."""
+        return str(next(self._mask_ids))
 
     def append_vector_mask(self, vector_mask: VectorMask,
                            image_width: int, image_height: int,
@@ -70,39 +126,44 @@ class ThyraDocument:
             return False
         item = self.action_stack.pop()
         self.vector_masks.append(item)
+        return True
 
     def clear(self):
         self.vector_masks.clear()
 
+    def snapshot(self) -> 'ThyraDocument':
+        """Copy of the document safe to read from another thread. Masks are
+        copied shallowly: edits replace their fields (and point lists)
+        rather than mutating them, so the copies stay consistent."""
+        return ThyraDocument(
+            src_file_path=self.src_file_path,
+            src_file_type=self.src_file_type,
+            vector_masks=[copy.copy(m) for m in self.vector_masks])
+
     def export_to_coco(self, image_width: int, image_height: int,
                        document_file_path: str):
-        # Build COCO structure
-        coco = {
-            "images": [{
-                "id": 1,
-                "file_name": os.path.basename(self.src_file_path),
-                "width": image_width,
-                "height": image_height,
-            }],
-            "annotations": [],
-            "categories": [{
-                "id": 1,
-                "name": "object",
-                "supercategory": "none"
-            }]
-        }
-
-        ann_id = 1
-        for mask in sorted(self.vector_masks, key=lambda x: x.ts):
-            ann = mask.export_to_coco(image_id=1, ann_id=ann_id,
-                                      image_w=image_width, image_h=image_height)
-            coco["annotations"].append(ann)
-            ann_id += 1
+        # Build COCO structure; annotations are generated lazily while writing
+        images = [{
+            "id": 1,
+            "file_name": os.path.basename(self.src_file_path),
+            "width": image_width,
+            "height": image_height,
+        }]
+        annotations = (
+            mask.export_to_coco(image_id=1, ann_id=ann_id,
+                                image_w=image_width, image_h=image_height)
+            for ann_id, mask in enumerate(
+                sorted(self.vector_masks, key=lambda x: x.ts), start=1)
+        )
+        categories = [{
+            "id": 1,
+            "name": "object",
+            "supercategory": "none"
+        }]
 
         # Save to file with _coco.json suffix
         base, ext = os.path.splitext(document_file_path)
         out_path = f"{base}_coco.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(coco, f, indent=2)
+        _stream_coco(out_path, images, annotations, categories)
 
         return out_path
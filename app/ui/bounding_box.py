@@ -4,10 +4,8 @@ from typing import List, Tuple
 from dataclasses_json import dataclass_json
 
 from PySide6.QtCore import QRectF, Qt
-from PySide6.QtGui import QPainter, QPen, QColor
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QColor
 
-from app.computational_geometry.coordinates_convertion import \
-    image_to_widget_coords
 from app.ui.vector_masks import VectorMask, register_vector_mask_object
 
 
@@ -36,22 +34,18 @@ class BoundingBox(VectorMask):
     def draw(self, painter: QPainter,
              img_w: int, img_h: int, widget_w: int, widget_h: int,
              rect: QRectF, pen: QPen):
-        # coordinates are normalized in [0..1]
-        x_abs = self.x * img_w
-        y_abs = self.y * img_h
-        w_abs = self.w * img_w
-        h_abs = self.h * img_h
-        p1 = image_to_widget_coords(
-            x_abs, y_abs,
-            img_w, img_h, widget_w, widget_h, rect)
-        p2 = image_to_widget_coords(
-            x_abs + w_abs, y_abs + h_abs,
-            img_w, img_h, widget_w, widget_h, rect)
-        draw_rect = QRectF(p1, p2)
+        # coordinates are normalized in [0..1]; snapped to whole pixels like
+        # the batch path so the raster engine can use integer span fills
+        draw_rect = self.bounding_rect(rect).toAlignedRect()
         painter.setPen(pen)
         painter.setBrush(Qt.BrushStyle.NoBrush)
         painter.drawRect(draw_rect)
 
+    def add_to_path(self, path: QPainterPath, rect: QRectF):
+        # the overlay batches boxes with drawRects rather than into its
+        # path; kept pixel-aligned to match the drawn box
+        path.addRect(QRectF(self.bounding_rect(rect).toAlignedRect()))
+
     def update(self, x_img_norm: float, y_img_norm: float):
         """
         Update bounding box coordinates based on new normalized point.
@@ -85,16 +79,9 @@ class BoundingBox(VectorMask):
                     active_index: int | None = None,
                     color=QColor(180, 180, 180)):
         """Corners index order: 0=(x,y), 1=(x+w,y), 2=(x+w,y+h), 3=(x,y+h)"""
-        from PySide6.QtGui import QPen
         pen = QPen(color, 2)
         painter.setPen(pen)
-        corners = [
-            (self.x, self.y),
-            (self.x + self.w, self.y),
-            (self.x + self.w, self.y + self.h),
-            (self.x, self.y + self.h),
-        ]
-        for idx, (nx, ny) in enumerate(corners):
+        for idx, (nx, ny) in enumerate(self.get_points()):
             px = rect.left() + nx * rect.width()
             py = rect.top() + ny * rect.height()
             if active_index is not None and idx == active_index:
@@ -136,26 +123,22 @@ class BoundingBox(VectorMask):
 
     def export_to_coco(self, image_id: int, ann_id: int, image_w: int,
                        image_h: int) -> dict:
+        # scale once; bbox and area derive from the polygon corners
+        polygon = self.to_polygon(image_w, image_h)
+        x, y, x_max, _, _, y_max = polygon[:6]
+        w, h = x_max - x, y_max - y
         return {
             "id": ann_id,
             "image_id": image_id,
             "category_id": 1,  # you may want to map from self.id
-            "bbox": [
-                self.x * image_w,
-                self.y * image_h,
-                self.w * image_w,
-                self.h * image_h
-            ],
-            "area": (self.w * image_w) * (self.h * image_h),
+            "bbox": [x, y, w, h],
+            "area": w * h,
             "iscrowd": 0,
-            "segmentation": [self.to_polygon()],  # polygon in absolute coords
+            "segmentation": [polygon],  # polygon in absolute coords
         }
 
-    def to_polygon(self):
+    def to_polygon(self, image_w: int = 1, image_h: int = 1):
         # COCO segmentation expects absolute coords
-        return [
-            self.x, self.y,
-            self.x + self.w, self.y,
-            self.x + self.w, self.y + self.h,
-            self.x, self.y + self.h,
-        ]
+        x, y = self.x * image_w, self.y * image_h
+        w, h = self.w * image_w, self.h * image_h
+        return [x, y, x + w, y, x + w, y + h, x, y + h]
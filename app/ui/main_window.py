@@ -15,18 +15,20 @@ import json
 from datetime import datetime
 from typing import List, Tuple
 import logging
+from collections import OrderedDict
 
 from PySide6.QtWidgets import (
     QMainWindow, QFileDialog, QToolBar, QLabel,
     QStatusBar, QVBoxLayout, QWidget, QStyle
 )
-from PySide6.QtCore import Qt, QEvent, QTimer, QSize
+from PySide6.QtCore import Qt, QEvent, QTimer, QSize, QThreadPool
 from PySide6.QtGui import QAction, QImage, QIcon
 
-import vlc
-
+from app.computational_geometry.polygon_geometry import shoelace_and_bbox
 from app.ui.overlay_widget import OverlayWidget
 from app.ui.video_widget import VideoWidget
+from app.workers.coco_exporter import CocoExporter
+from app.workers.image_loader import ImageLoader
 from configuration import ICO_DIR, THYRA_DIR, THYRA_VIDEO_DIR, THYRA_IMAGE_DIR, \
     LOGGER_NAME
 from app.thyra_document import ThyraDocument
@@ -34,6 +36,44 @@ from app.thyra_settings import ThyraSettings
 
 logger = logging.getLogger(LOGGER_NAME)
 
+MASK_RECEIVED_MSG = "Mask received (stub)"
+COUNT_FMT = "Density count (stub): %d"
+MEDIA_CACHE_SIZE = 8  # parsed vlc.Media objects kept for re-opening
+POLL_ACTIVE_MSEC = 50  # worker result polling while responses arrive
+POLL_IDLE_MSEC = 1000  # ... and once res_q has been empty for a while
+POLL_IDLE_TICKS = 20  # empty active polls (~1 s) before backing off
+REDECODE_DELAY_MSEC = 150  # let resizes settle before decoding an image again
+
+
+def _vlc_hw_decoder() -> str:
+    """Preferred libavcodec hardware decoder for the current platform."""
+    if sys.platform.startswith("darwin"):
+        return "videotoolbox"
+    if sys.platform.startswith("win"):
+        return "d3d11va"
+    if sys.platform.startswith("linux"):
+        return "vaapi"
+    return "any"
+
+
+def _vlc_instance_args() -> List[str]:
+    return [
+        "--vout=gl",
+        f"--avcodec-hw={_vlc_hw_decoder()}",
+        "--no-audio-time-stretch",
+        # low latency: small input buffers, no clock smoothing, drop late
+        "--file-caching=100",
+        "--network-caching=150",
+        "--clock-jitter=0",
+        "--clock-synchro=0",
+        "--drop-late-frames",
+        "--skip-frames",
+    ]
+
+
+# per-media decoder options: fast libavcodec paths, one thread per core
+VLC_MEDIA_OPTIONS = (":avcodec-fast", ":avcodec-threads=0")
+
 os.makedirs(THYRA_VIDEO_DIR, exist_ok=True)
 os.makedirs(THYRA_IMAGE_DIR, exist_ok=True)
 
@@ -45,6 +85,16 @@ class MainWindow(QMainWindow):
         self.image_width = 0
         self.current_document_file_path = ""
         self.document: ThyraDocument = ThyraDocument()
+        self._image_loader: ImageLoader | None = None
+        # shown image and the display size it was decoded for; a bigger
+        # view decodes it again (see _redecode_if_upscaled)
+        self._image_path: str | None = None
+        self._decoded_for = QSize()
+        self._redecode_timer = QTimer(self)
+        self._redecode_timer.setSingleShot(True)
+        self._redecode_timer.setInterval(REDECODE_DELAY_MSEC)
+        self._redecode_timer.timeout.connect(self._redecode_if_upscaled)
+        self._coco_exporter: CocoExporter | None = None
         self.settings: ThyraSettings = ThyraSettings()
         self.setWindowIcon(QIcon(os.path.join(ICO_DIR, "favicon.icns")))
         self.icon_pause = self.style().standardIcon(
@@ -55,9 +105,13 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("PySide6 + OpenGL Video/Image + Overlay")
         self.showMaximized()
 
-        # VLC
-        self.vlc_instance = vlc.Instance("--vout=gl")
-        self.mediaplayer = self.vlc_instance.media_player_new()
+        # VLC is loaded on first video open (see _ensure_vlc)
+        self.vlc_instance = None
+        self.mediaplayer = None
+        # platform drawable setter, resolved with the player
+        self._set_drawable = None
+        self._attached_winid: int | None = None
+        self._media_cache: OrderedDict = OrderedDict()  # path -> vlc.Media
 
         # Central layout
         central = QWidget()
@@ -92,13 +146,11 @@ class MainWindow(QMainWindow):
         self.path_label = QLabel("No file")
         self.status.addWidget(self.path_label)
 
-        # VLC output attach
-        self._attach_vlc_output()
-
         self.load_settings()
-        # poll worker responses
+        # poll worker responses; only runs while requests are outstanding
+        self._idle_polls = 0
         self.poll_timer = QTimer(self)
-        self.poll_timer.setInterval(50)
+        self.poll_timer.setInterval(POLL_ACTIVE_MSEC)
         self.poll_timer.timeout.connect(self.poll_workers)
         self.poll_timer.start()
 
@@ -176,16 +228,14 @@ class MainWindow(QMainWindow):
             "Box mode", self)
         self.action_mode_box.setCheckable(True)
         self.action_mode_box.setChecked(True)
-        self.action_mode_box.triggered.connect(
-            lambda: self.set_draw_mode("box"))
+        self.action_mode_box.triggered.connect(self.set_box_mode)
         toolbar.addAction(self.action_mode_box)
 
         self.action_mode_poly = QAction(
             QIcon(os.path.join(ICO_DIR, 'layer-shape-polygon.png')),
             "Polygon mode", self)
         self.action_mode_poly.setCheckable(True)
-        self.action_mode_poly.triggered.connect(
-            lambda: self.set_draw_mode("poly"))
+        self.action_mode_poly.triggered.connect(self.set_poly_mode)
         toolbar.addAction(self.action_mode_poly)
 
         toolbar.addSeparator()
@@ -231,9 +281,11 @@ class MainWindow(QMainWindow):
                     mr_abs = mr if os.path.isabs(mr) else os.path.join(
                         THYRA_DIR, mr)
                     if os.path.exists(mr_abs):
-                        # try to open silently (don't show dialog)
-                        self.load_document(mr_abs)
-                        self.current_document_file_path = mr_abs
+                        # try to open silently (don't show dialog), once the
+                        # event loop runs and the window is laid out, so an
+                        # image is decoded for the real view size
+                        QTimer.singleShot(
+                            0, lambda: self.load_document(mr_abs))
             else:
                 # create default settings file
                 with open(settings_path, "w", encoding="utf-8") as f:
@@ -353,7 +405,7 @@ class MainWindow(QMainWindow):
                     else:
                         self.open_image(full_src)
 
-        self.overlay.update()
+        self.overlay.shapes_changed()
         msg = f"Opened document {path}"
         self.status.showMessage(msg, 3000)
         logger.info(msg)
@@ -422,36 +474,88 @@ class MainWindow(QMainWindow):
             logger.error(msg)
             return
 
-        self.document.export_to_coco(self.image_width, self.image_height,
-                                     self.current_document_file_path)
+        # Serialize on the thread pool so the UI keeps painting
+        exporter = CocoExporter(self.document.snapshot(), self.image_width,
+                                self.image_height,
+                                self.current_document_file_path)
+        exporter.signals.finished.connect(self._on_coco_exported)
+        exporter.signals.failed.connect(self._on_coco_export_failed)
+        self._coco_exporter = exporter
+        QThreadPool.globalInstance().start(exporter)
+
+    def _on_coco_exported(self, out_path: str):
+        self._coco_exporter = None
+        msg = f"Exported COCO: {out_path}"
+        self.status.showMessage(msg, 4000)
+        logger.info(msg)
+
+    def _on_coco_export_failed(self, error: str):
+        self._coco_exporter = None
+        msg = f"Failed to export COCO: {error}"
+        self.status.showMessage(msg, 4000)
+        logger.error(msg)
 
     # -----------------------------
     # Event filter
     # -----------------------------
     def eventFilter(self, obj, ev):
         if obj is self.video_widget and ev.type() == QEvent.Type.Resize:
-            self.overlay.setGeometry(self.video_widget.geometry())
+            geometry = self.video_widget.geometry()
+            # re-enabling updates repaints the whole overlay; skip no-ops
+            if geometry != self.overlay.geometry():
+                # coalesce the move + resize repaints into a single paint
+                self.overlay.setUpdatesEnabled(False)
+                self.overlay.setGeometry(geometry)
+                self.overlay.setUpdatesEnabled(True)
+            if self.video_widget.image is not None:
+                self._redecode_timer.start()
         return super().eventFilter(obj, ev)
 
     # -----------------------------
     # VLC output
     # -----------------------------
-    def _attach_vlc_output(self):
+    def _ensure_vlc(self):
+        """Import libvlc and create the player on first use. Loading libvlc
+        probes its plugin cache, which is slow and not needed for images."""
+        if self.vlc_instance is not None:
+            return
+        import vlc
+        self.vlc_instance = vlc.Instance(_vlc_instance_args())
+        self.mediaplayer = self.vlc_instance.media_player_new()
         if sys.platform.startswith("darwin"):
-            try:
-                self.mediaplayer.set_nsobject(int(self.video_widget.winId()))
-            except Exception as e:
-                logger.error(f"set_nsobject failed: {e}")
+            self._set_drawable = self.mediaplayer.set_nsobject
         elif sys.platform.startswith("win"):
-            try:
-                self.mediaplayer.set_hwnd(int(self.video_widget.winId()))
-            except Exception as e:
-                logger.error(f"set_hwnd failed: {e}")
+            self._set_drawable = self.mediaplayer.set_hwnd
         else:
-            try:
-                self.mediaplayer.set_xwindow(int(self.video_widget.winId()))
-            except Exception as e:
-                logger.error(f"set_xwindow failed: {e}")
+            self._set_drawable = self.mediaplayer.set_xwindow
+
+    def _get_media(self, path: str):
+        """Return a vlc.Media for path, reusing a recently opened one so the
+        file is not probed again. Least recently used entries are released."""
+        media = self._media_cache.get(path)
+        if media is not None:
+            self._media_cache.move_to_end(path)
+            return media
+        media = self.vlc_instance.media_new(path)
+        media.add_options(*VLC_MEDIA_OPTIONS)
+        self._media_cache[path] = media
+        if len(self._media_cache) > MEDIA_CACHE_SIZE:
+            _, evicted = self._media_cache.popitem(last=False)
+            evicted.release()
+        return media
+
+    def _attach_vlc_output(self):
+        """Point the player at the video window. The drawable persists
+        across media changes, so it is only set again if the native window
+        was recreated."""
+        winid = int(self.video_widget.winId())
+        if winid == self._attached_winid:
+            return
+        try:
+            self._set_drawable(winid)
+            self._attached_winid = winid
+        except Exception as e:
+            logger.error(f"{self._set_drawable.__name__} failed: {e}")
 
     # -----------------------------
     # Open video/image
@@ -476,8 +580,11 @@ class MainWindow(QMainWindow):
         self.document.src_file_type = "video"
         self.path_label.setText(path)
         self.video_widget.image = None  # clear previous image
+        self._image_loader = None  # drop any pending image decode
+        self._image_path = None
 
-        media = self.vlc_instance.media_new(path)
+        self._ensure_vlc()
+        media = self._get_media(path)
         self.mediaplayer.set_media(media)
         self._attach_vlc_output()
 
@@ -526,30 +633,70 @@ class MainWindow(QMainWindow):
         self.document.src_file_path = path
         self.document.src_file_type = "image"
         self.path_label.setText(path)
-        self.mediaplayer.stop()
+        if self.mediaplayer is not None:
+            self.mediaplayer.stop()
         self.action_play.setText("Play")
-
-        img = QImage(path)
-        if img.isNull():
-            msg = f"Failed to load image {path}"
-            self.status.showMessage(msg, 3000)
-            logger.error(msg)
+        self._image_path = path
+        self._start_image_load(path)
+
+    def _start_image_load(self, path: str):
+        # Decode off the GUI thread, only at the resolution being displayed
+        size = self.video_widget.size() * self.video_widget.devicePixelRatio()
+        loader = ImageLoader(path, size)
+        loader.signals.loaded.connect(self._on_image_loaded)
+        loader.signals.failed.connect(self._on_image_failed)
+        self._image_loader = loader
+        self._decoded_for = size
+        QThreadPool.globalInstance().start(loader)
+
+    def _redecode_if_upscaled(self):
+        """Decode the shown image again when the view grew past the size it
+        was decoded for (e.g. opened before the window was maximized), unless
+        it was already decoded at full source resolution."""
+        img = self.video_widget.image
+        if img is None or self._image_path is None \
+                or self._image_loader is not None:
+            return
+        if img.width() >= self.image_width \
+                and img.height() >= self.image_height:
             return
+        size = self.video_widget.size() * self.video_widget.devicePixelRatio()
+        if size.width() > self._decoded_for.width() \
+                or size.height() > self._decoded_for.height():
+            self._start_image_load(self._image_path)
+
+    def _on_image_loaded(self, path: str, img: QImage, width: int,
+                         height: int):
+        # ignore results of a load superseded by a newer open
+        if self._image_loader is None or self._image_loader.path != path:
+            return
+        self._image_loader = None
 
         self.video_widget.image = img
         self.video_widget.update()
 
-        # Track image dimensions
-        self.image_width = img.width()
-        self.image_height = img.height()
+        # Track source image dimensions (not the decoded display size)
+        self.image_width = width
+        self.image_height = height
+        self.overlay.update()
         logger.info(
             f"Loaded image {path} with size {self.image_width}x{self.image_height}")
+        # the view may have grown while decoding
+        self._redecode_timer.start()
+
+    def _on_image_failed(self, path: str, error: str):
+        if self._image_loader is None or self._image_loader.path != path:
+            return
+        self._image_loader = None
+        msg = f"Failed to load image {path}: {error}"
+        self.status.showMessage(msg, 3000)
+        logger.error(msg)
 
     # -----------------------------
     # Video controls
     # -----------------------------
     def play_pause(self):
-        if self.document.src_file_type != "video":
+        if self.document.src_file_type != "video" or self.mediaplayer is None:
             return
         if self.mediaplayer.is_playing():
             self.mediaplayer.pause()
@@ -561,7 +708,7 @@ class MainWindow(QMainWindow):
             self.action_play.setText("Pause")
 
     def stop(self):
-        if self.document.src_file_type != "video":
+        if self.document.src_file_type != "video" or self.mediaplayer is None:
             return
         self.mediaplayer.stop()
         self.action_play.setText("Play")
@@ -576,32 +723,46 @@ class MainWindow(QMainWindow):
             self.action_mode_box.setChecked(mode == "box")
             self.action_mode_poly.setChecked(mode == "poly")
 
+    def set_box_mode(self):
+        self.set_draw_mode("box")
+
+    def set_poly_mode(self):
+        self.set_draw_mode("poly")
+
     @staticmethod
     def _polygon_area(points: List[Tuple[float, float]]) -> float:
-        n = len(points)
-        if n < 3: return 0
-        area = 0
-        for i in range(n):
-            x1, y1 = points[i]
-            x2, y2 = points[(i + 1) % n]
-            area += x1 * y2 - x2 * y1
-        return area / 2.0
+        """Signed shoelace area (see shoelace_and_bbox)."""
+        if len(points) < 3:
+            return 0.0
+        return shoelace_and_bbox(points)[0]
 
     def poll_workers(self):
         # poll for responses from worker processes
+        status_visible = not self.status.isHidden()
+        received = False
         try:
             while not self.app.res_q.empty():
                 msg = self.app.res_q.get_nowait()
+                received = True
+                mask = msg.get('mask')
+                count = msg.get('count')
                 # handle segment stub
-                if msg.get('mask') is not None:
-                    # self.canvas.apply_mask(msg['mask'])
-                    log_msg = 'Mask received (stub)'
-                    logger.info(log_msg)
-                    self.status.showMessage(log_msg)
-                if msg.get('count') is not None:
-                    log_msg = f"Density count (stub): {msg['count']}"
-                    self.status.showMessage(log_msg)
-                    logger.info(log_msg)
+                if mask is not None:
+                    # self.canvas.apply_mask(mask)
+                    logger.info(MASK_RECEIVED_MSG)
+                    if status_visible:
+                        self.status.showMessage(MASK_RECEIVED_MSG)
+                if count is not None:
+                    logger.info(COUNT_FMT, count)
+                    if status_visible:
+                        self.status.showMessage(COUNT_FMT % count)
         except Exception as e:
             logger.error(f"Poll workers: {e}")
-            pass
+        # Back off while the workers are quiet: a request may get no
+        # response at all, so idleness is judged from res_q, not from
+        # requests sent
+        self._idle_polls = 0 if received else self._idle_polls + 1
+        interval = POLL_IDLE_MSEC if self._idle_polls >= POLL_IDLE_TICKS \
+            else POLL_ACTIVE_MSEC
+        if self.poll_timer.interval() != interval:
+            self.poll_timer.setInterval(interval)
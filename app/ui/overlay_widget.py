@@ -1,17 +1,18 @@
 # app/ui/overlay_widget.py
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Optional, List, Tuple
-import uuid
-from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, Tuple
 import logging
 
-from PySide6.QtCore import Qt, QTimer, QPointF
-from PySide6.QtGui import QPainter, QPen, QColor, QCursor, QKeySequence
+from PySide6.QtCore import Qt, QAbstractAnimation, QPointF, QRect, QRectF, \
+    QTimer, QVariantAnimation
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QColor, QCursor, \
+    QKeySequence, QPixmap, QRegion
 from PySide6.QtWidgets import QWidget, QMessageBox, QApplication
 
 from app.computational_geometry.coordinates_convertion import \
     widget_to_image_coords, compute_video_rect
+from app.ui.bounding_box import BoundingBox
 from app.ui.vector_masks import VectorMask
 
 if TYPE_CHECKING:
@@ -23,9 +24,13 @@ logger = logging.getLogger(__name__)
 
 PEN_WIDTH = 2
 DASH_OFFSET = 0.0
-ANIMATION_MSEC = 30
+DASH_PERIOD = 12.0  # dash offset wraps after this many pixels
+ANIMATION_MSEC = 30  # time per one-pixel dash step
+MOVE_COALESCE_MSEC = 8  # at most one mouse-move repaint per ~120 Hz frame
 MOVING_POINT_COLOR = QColor(255, 180, 0)  # highlight color for active vertex
 ACTIVE_VERTEX_RADIUS_PX = 8  # pixel threshold to detect vertex hover
+DAMAGE_MARGIN_PX = 8  # pen width + vertex markers around a mask's bbox
+GRID_CELL_PX = 128  # cell size of the spatial index over mask rects
 
 
 class OverlayWidget(QWidget):
@@ -36,7 +41,6 @@ class OverlayWidget(QWidget):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents,
                           False)
-        self.setMouseTracking(True)
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
 
         screen = QApplication.primaryScreen()
@@ -49,6 +53,9 @@ class OverlayWidget(QWidget):
         self.mode = "box"  # "box" or "poly"
         self.dragging = False
         self.last_mouse_pos: Optional[QPointF] = None
+        # integer pixel of the last handled move; sub-pixel moves within
+        # it (high-DPI / high-rate mice) change nothing visible
+        self._last_int_pos: Tuple[int, int] = (-1, -1)
         self.highlighted_point_index: Optional[int] = None
 
         # Live drawing state
@@ -59,18 +66,72 @@ class OverlayWidget(QWidget):
         self.active_vertex_index: Optional[int] = None
         self.dragging_vertex: bool = False
 
-        # Animation
-        self.dash_offset = DASH_OFFSET
-        self.anim_timer = QTimer(self)
-        self.anim_timer.setInterval(ANIMATION_MSEC)
-        self.anim_timer.timeout.connect(self._on_anim_tick)
-        self.anim_timer.start()
-
         # Colors
         self.box_color = QColor(255, 250, 240)
         self.live_color = QColor(226, 61, 40)
         self.selected_color = QColor(160, 160, 160)
 
+        # Animation: pens are built once, a tick only advances their offset
+        self.dash_offset = DASH_OFFSET
+        self._mask_pen = self._make_dash_pen(self.box_color, [8.0, 4.0])
+        self._live_pen = self._make_dash_pen(self.live_color, [6.0, 6.0])
+        # Offset is interpolated by Qt's animation driver (time based); it
+        # only runs while there is an outline to march, see paintEvent
+        self.dash_anim = QVariantAnimation(self)
+        self.dash_anim.setStartValue(DASH_OFFSET)
+        self.dash_anim.setEndValue(DASH_OFFSET + DASH_PERIOD)
+        self.dash_anim.setDuration(int(DASH_PERIOD * ANIMATION_MSEC))
+        self.dash_anim.setLoopCount(-1)
+        self.dash_anim.valueChanged.connect(self._on_dash)
+
+        # Finished masks batched into one rect list (boxes) and one path
+        # (everything else), rebuilt only when the masks or the video rect
+        # change; ticks repaint just their bounds
+        self._shapes_path: Optional[QPainterPath] = None
+        self._box_rects: List[QRect] = []  # pixel-aligned
+        # per-mask damage rects, for culling when only part of the batch
+        # is dirty
+        self._mask_rects: List[Tuple[QRect, VectorMask]] = []
+        self._mask_index: Dict[int, int] = {}  # id(mask) -> _mask_rects index
+        # uniform grid: cell -> indices into _mask_rects overlapping it
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        # Mask being edited in place (dragged): kept out of the batch and
+        # drawn on its own, so an edit only moves its entry in the caches
+        # instead of rebuilding them for every mask
+        self._floating: Optional[VectorMask] = None
+        self._floating_rect = QRect()
+        self._shapes_key: Optional[tuple] = None
+        self._shapes_serial = 0  # bumped on every in-place mask edit
+        self._marching_rect = QRect()
+        # union of the per-mask rects: scattered masks repaint only their
+        # own areas, not the empty space between them
+        self._marching_region = QRegion()
+        # Vertex markers of the selected mask do not animate: they are
+        # rendered into a pixmap and blitted on ticks
+        self._static_pixmap: Optional[QPixmap] = None
+        self._static_rect = QRect()
+        self._static_key: Optional[tuple] = None
+        # Mask rects from the last paint; repainted on each tick
+        self._last_damage = QRegion()
+
+        # Mouse-move repaints are accumulated and flushed once per frame
+        self._pending_damage = QRect()
+        self._move_coalesce = QTimer(self)
+        self._move_coalesce.setSingleShot(True)
+        self._move_coalesce.setInterval(MOVE_COALESCE_MSEC)
+        self._move_coalesce.timeout.connect(self._flush_pending_damage)
+
+    @property
+    def selected_mask(self) -> Optional[VectorMask]:
+        return self._selected_mask
+
+    @selected_mask.setter
+    def selected_mask(self, mask: Optional[VectorMask]):
+        self._selected_mask = mask
+        # Button-less moves only matter for the vertex hover highlight of a
+        # selected mask; drags and live drawing arrive with a button held
+        self.setMouseTracking(mask is not None)
+
     def set_mode(self, mode: str):
         assert mode in ("box", "poly")
         self.mode = mode
@@ -84,12 +145,188 @@ class OverlayWidget(QWidget):
     def sizeHint(self):
         return self.parent().size()
 
-    def _on_anim_tick(self):
-        self.dash_offset += 1.0
-        if self.dash_offset > 12.0:
-            self.dash_offset = 0.0
+    def _on_dash(self, value: float):
+        # the driver ticks faster than the dash moves; repaint only on
+        # whole-pixel steps
+        offset = float(int(value))
+        if offset == self.dash_offset:
+            return
+        self.dash_offset = offset
+        self._mask_pen.setDashOffset(self.dash_offset)
+        self._live_pen.setDashOffset(self.dash_offset)
+        if not self._last_damage.isEmpty():
+            self.update(self._last_damage)
+
+    def _set_dash_running(self, running: bool):
+        is_running = \
+            self.dash_anim.state() == QAbstractAnimation.State.Running
+        if running and not is_running:
+            self.dash_anim.start()
+        elif not running and is_running:
+            self.dash_anim.stop()
+
+    def shapes_changed(self):
+        """Drop the cached mask path after masks were added, removed or
+        edited in place, or the document was replaced, and repaint the
+        overlay."""
+        self._floating = None
+        self._shapes_edited()
         self.update()
 
+    def _schedule_update(self, damage: QRect):
+        """Queue `damage` for repaint; high-rate mouse input then costs one
+        paint per MOVE_COALESCE_MSEC instead of one per event."""
+        self._pending_damage = self._pending_damage.united(damage)
+        if not self._move_coalesce.isActive():
+            self._move_coalesce.start()
+
+    def _flush_pending_damage(self):
+        self.update(self._pending_damage)
+        self._pending_damage = QRect()
+
+    def _shapes_edited(self, mask: Optional[VectorMask] = None):
+        """Invalidate what is cached from mask geometry. With `mask`, only
+        that mask was edited in place: the first such edit takes it out of
+        the batch, later ones just update its own entry."""
+        self._shapes_serial += 1
+        if mask is None or mask is not self._floating:
+            self._floating = mask
+            self._shapes_path = None
+
+    @staticmethod
+    def _cells(area: QRect):
+        """Grid cells overlapping `area`."""
+        c = GRID_CELL_PX
+        for cy in range(area.top() // c, area.bottom() // c + 1):
+            for cx in range(area.left() // c, area.right() // c + 1):
+                yield cx, cy
+
+    def _ensure_shapes_path(self, rect: QRectF):
+        masks = self.main_window.document.vector_masks
+        key = (rect.x(), rect.y(), rect.width(), rect.height(),
+               id(masks), len(masks))
+        if self._shapes_path is not None and key == self._shapes_key:
+            if self._floating is not None:
+                self._move_mask_entry(self._floating, rect)
+            return
+        path = QPainterPath()
+        box_rects = []
+        batched_rects = []
+        grid = {}
+        self._mask_rects = []
+        self._mask_index = {}
+        self._floating_rect = QRect()
+        for i, mask in enumerate(masks):
+            mask_rect = self._damage_rect(mask, rect)
+            self._mask_rects.append((mask_rect, mask))
+            self._mask_index[id(mask)] = i
+            for cell in self._cells(mask_rect):
+                grid.setdefault(cell, []).append(i)
+            if mask is self._floating:
+                self._floating_rect = mask_rect
+                continue
+            batched_rects.append(mask_rect)
+            if isinstance(mask, BoundingBox):
+                box_rects.append(mask.bounding_rect(rect).toAlignedRect())
+            else:
+                mask.add_to_path(path, rect)
+        self._shapes_path = path
+        self._box_rects = box_rects
+        self._shapes_key = key
+        self._grid = grid
+
+        if self._floating_rect.isNull():
+            self._floating = None  # no longer in the document
+        self._marching_region = self._union_region(batched_rects)
+
+        bounds = path.boundingRect() if not path.isEmpty() else QRectF()
+        for box_rect in box_rects:
+            bounds = bounds.united(QRectF(box_rect))
+        m = DAMAGE_MARGIN_PX
+        self._marching_rect = bounds.toAlignedRect().adjusted(
+            -m, -m, m, m) if not bounds.isNull() else QRect()
+
+    @staticmethod
+    def _union_region(rects: List[QRect]) -> QRegion:
+        """Union of possibly overlapping rects, merged pairwise so each rect
+        takes part in O(log n) unions instead of one growing region being
+        re-merged n times. (QRegion.setRects would store overlapping rects
+        as-is and yield an invalid region.)"""
+        regions = [QRegion(r) for r in rects]
+        while len(regions) > 1:
+            merged = [a.united(b) for a, b in zip(regions[::2], regions[1::2])]
+            if len(regions) % 2:
+                merged.append(regions[-1])
+            regions = merged
+        return regions[0] if regions else QRegion()
+
+    def _move_mask_entry(self, mask: VectorMask, rect: QRectF):
+        """Refresh the rect and grid cells of one mask edited in place."""
+        i = self._mask_index.get(id(mask))
+        if i is None:
+            return
+        old_rect = self._mask_rects[i][0]
+        new_rect = self._damage_rect(mask, rect)
+        self._floating_rect = new_rect
+        if new_rect == old_rect:
+            return
+        self._mask_rects[i] = (new_rect, mask)
+        for cell in self._cells(old_rect):
+            self._grid[cell].remove(i)
+        for cell in self._cells(new_rect):
+            self._grid.setdefault(cell, []).append(i)
+
+    def _masks_in(self, area: QRect) -> List[Tuple[QRect, VectorMask]]:
+        """(rect, mask) entries whose grid cells overlap `area`, in paint
+        order. Requires a current _ensure_shapes_path."""
+        hits = set()
+        for cell in self._cells(area):
+            hits.update(self._grid.get(cell, ()))
+        return [self._mask_rects[i] for i in sorted(hits)]
+
+    def _ensure_static_layer(self, img_w: int, img_h: int, widget_w: int,
+                             widget_h: int, rect: QRectF):
+        mask = self.selected_mask
+        dpr = self.devicePixelRatioF()
+        key = (id(mask), self.active_vertex_index, self._shapes_serial,
+               rect.x(), rect.y(), rect.width(), rect.height(), dpr)
+        if self._static_pixmap is not None and key == self._static_key:
+            return
+        self._static_key = key
+        self._static_rect = self._damage_rect(mask, rect)
+        pixmap = QPixmap(self._static_rect.size() * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(-self._static_rect.topLeft())
+        self._draw_selection_points(painter, img_w, img_h, widget_w, widget_h,
+                                    rect)
+        painter.end()
+        self._static_pixmap = pixmap
+
+    def _draw_selection_points(self, painter: QPainter, img_w: int,
+                               img_h: int, widget_w: int, widget_h: int,
+                               rect: QRectF):
+        mask = self.selected_mask
+        # default color for points
+        mask.draw_points(painter, img_w, img_h, widget_w, widget_h, rect,
+                         active_index=self.active_vertex_index,
+                         color=self.selected_color)
+        # if active vertex exists draw additional highlight circle
+        if self.active_vertex_index is not None:
+            # draw a stronger highlight circle using MOVING_POINT_COLOR
+            mask.draw_points(painter, img_w, img_h, widget_w, widget_h, rect,
+                             active_index=self.active_vertex_index,
+                             color=MOVING_POINT_COLOR)
+
+    @staticmethod
+    def _damage_rect(mask: VectorMask, rect: QRectF) -> QRect:
+        """Widget-space rect covering everything painted for `mask`."""
+        m = DAMAGE_MARGIN_PX
+        return mask.bounding_rect(rect).toAlignedRect().adjusted(-m, -m, m, m)
+
     @staticmethod
     def find_nearest_vertex(mask: VectorMask, x_img_norm: float,
                             y_img_norm: float,
@@ -119,6 +356,8 @@ class OverlayWidget(QWidget):
     # -----------------------------
     def mousePressEvent(self, event):
         self.setFocus()
+        # a new gesture must see its first move even on the same pixel
+        self._last_int_pos = (-1, -1)
         if event.button() != Qt.MouseButton.LeftButton:
             return
 
@@ -160,15 +399,11 @@ class OverlayWidget(QWidget):
         self.dragging_vertex = False
         self.last_mouse_pos = None
 
-        # Create a new current_mask using the VectorMask factory
-        self.current_mask = VectorMask.create(self.mode, x_img_norm, y_img_norm)
-
-        # Assign unique ID and timestamp
-        try:
-            self.current_mask.id = str(uuid.uuid4())
-            self.current_mask.ts = int(datetime.now().timestamp())
-        except Exception:
-            pass
+        # Create a new current_mask using the VectorMask factory (assigns
+        # a sequential document-unique ID and timestamp)
+        self.current_mask = VectorMask.create(
+            self.mode, x_img_norm, y_img_norm,
+            mask_id=self.main_window.document.new_mask_id())
 
         # Sync toolbar mode with MainWindow
         try:
@@ -189,8 +424,11 @@ class OverlayWidget(QWidget):
                                               widget_w, widget_h, rect)
         nx, ny = x_img / img_w, y_img / img_h
 
-        # Hit test existing masks (from topmost)
-        for mask in reversed(self.main_window.document.vector_masks):
+        # Hit test existing masks (from topmost), only those indexed near
+        # the click
+        self._ensure_shapes_path(rect)
+        pos = event.position().toPoint()
+        for _, mask in reversed(self._masks_in(QRect(pos, pos))):
             if mask.contains(nx, ny):
                 self.selected_mask = mask
                 self.current_mask = None  # stop drawing
@@ -222,14 +460,14 @@ class OverlayWidget(QWidget):
                     # push onto document.action_stack for undo
                     self.main_window.document.action_stack.append(
                         self.selected_mask)
-                self.update()
+                self.shapes_changed()
                 return
             elif self.selected_mask:
                 # delete whole mask
                 self.main_window.document.delete_vector_mask(self.selected_mask)
                 self.selected_mask = None
                 self.active_vertex_index = None
-                self.update()
+                self.shapes_changed()
                 return
 
         # Undo/Redo shortcuts
@@ -243,6 +481,12 @@ class OverlayWidget(QWidget):
         super().keyPressEvent(event)
 
     def mouseMoveEvent(self, event):
+        pos = event.position()
+        int_pos = (int(pos.x()), int(pos.y()))
+        if int_pos == self._last_int_pos:
+            return
+        self._last_int_pos = int_pos
+
         img_w, img_h = self.main_window.image_width, self.main_window.image_height
         widget_w, widget_h = self.width(), self.height()
         rect = compute_video_rect(img_w, img_h, widget_w, widget_h)
@@ -252,10 +496,13 @@ class OverlayWidget(QWidget):
 
         # Dragging a vertex: move that point only
         if self.dragging_vertex and self.selected_mask and self.active_vertex_index is not None:
+            prev_rect = self._damage_rect(self.selected_mask, rect)
             self.selected_mask.move_point(
                 self.active_vertex_index, x_img_norm, y_img_norm)
+            self._shapes_edited(self.selected_mask)
             self.last_mouse_pos = event.position()
-            self.update()
+            self._schedule_update(prev_rect.united(
+                self._damage_rect(self.selected_mask, rect)))
             return
 
         # Dragging whole mask
@@ -266,15 +513,20 @@ class OverlayWidget(QWidget):
             dy = (
                      event.position().y() - self.last_mouse_pos.y()
                  ) / self.height()
+            prev_rect = self._damage_rect(self.selected_mask, rect)
             self.selected_mask.move(dx, dy)
+            self._shapes_edited(self.selected_mask)
             self.last_mouse_pos = event.position()
-            self.update()
+            self._schedule_update(prev_rect.united(
+                self._damage_rect(self.selected_mask, rect)))
             return
 
         # Live drawing (new mask)
         if self.current_mask:
+            prev_rect = self._damage_rect(self.current_mask, rect)
             self.current_mask.update(x_img_norm, y_img_norm)
-            self.update()
+            self._schedule_update(prev_rect.united(
+                self._damage_rect(self.current_mask, rect)))
             return
 
         # Hover: highlight nearest vertex if any
@@ -287,16 +539,17 @@ class OverlayWidget(QWidget):
                 if self.active_vertex_index != idx:
                     self.active_vertex_index = idx
                     self.setCursor(QCursor(Qt.CursorShape.OpenHandCursor))
-                    self.update()
+                    self.update(self._damage_rect(self.selected_mask, rect))
             else:
                 if self.active_vertex_index is not None:
                     self.active_vertex_index = None
                     self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
-                    self.update()
+                    self.update(self._damage_rect(self.selected_mask, rect))
 
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
+        self._last_int_pos = (-1, -1)
         if event.button() != Qt.MouseButton.LeftButton:
             return
 
@@ -319,6 +572,7 @@ class OverlayWidget(QWidget):
 
         # Finish live mask drawing
         elif self.current_mask:
+            self.current_mask.finish_drawing()
             img_w, img_h = self.main_window.image_width, self.main_window.image_height
             appended = self.main_window.document.append_vector_mask(
                 self.current_mask,
@@ -336,51 +590,95 @@ class OverlayWidget(QWidget):
     # Painting
     # -----------------------------
     def paintEvent(self, event):
+        # Antialiasing is toggled per mask: axis-aligned boxes on whole
+        # pixels gain nothing from it and fill faster without
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        antialiasing = QPainter.RenderHint.Antialiasing
 
         img_w = self.main_window.image_width
         img_h = self.main_window.image_height
         widget_w, widget_h = self.width(), self.height()
         rect = compute_video_rect(img_w, img_h, widget_w, widget_h)
 
-        # Draw finished masks
-        pen = self._make_dash_pen(self.box_color, [8.0, 4.0])
-        for mask in self.main_window.document.vector_masks:
-            mask.draw(painter, img_w, img_h, widget_w, widget_h, rect, pen)
+        # Only masks intersecting the damaged area are redrawn; the region
+        # of all mask rects is kept for the next animation tick
+        dirty = event.rect()
+        painter.setClipRegion(event.region())
+
+        # Draw finished masks: one drawRects batch plus one dashed path
+        self._ensure_shapes_path(rect)
+        damage = self._marching_region
+        if self._marching_rect.intersects(dirty):
+            painter.setPen(self._mask_pen)
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            # event.rect() never extends past the widget, while the
+            # margin puts masks at the video edge partly outside it
+            if dirty.contains(self._marching_rect.intersected(self.rect())):
+                if self._box_rects:
+                    painter.setRenderHint(antialiasing, False)
+                    painter.drawRects(self._box_rects)
+                painter.setRenderHint(antialiasing, True)
+                painter.drawPath(self._shapes_path)
+            else:
+                # partial repaint (e.g. a drag): only stroke masks that
+                # intersect the damage, not the whole batch
+                for mask_rect, mask in self._masks_in(dirty):
+                    if mask is not self._floating \
+                            and mask_rect.intersects(dirty):
+                        painter.setRenderHint(
+                            antialiasing, not isinstance(mask, BoundingBox))
+                        mask.draw(painter, img_w, img_h, widget_w, widget_h,
+                                  rect, self._mask_pen)
+
+        # Draw the mask being edited in place, outside the batch
+        if self._floating is not None:
+            damage = damage.united(self._floating_rect)
+            if self._floating_rect.intersects(dirty):
+                painter.setRenderHint(
+                    antialiasing, not isinstance(self._floating, BoundingBox))
+                self._floating.draw(painter, img_w, img_h, widget_w, widget_h,
+                                    rect, self._mask_pen)
 
         # Draw live mask
         if self.current_mask:
-            pen_live = self._make_dash_pen(self.live_color, [6.0, 6.0])
-            self.current_mask.draw(painter, img_w, img_h, widget_w, widget_h,
-                                   rect, pen_live)
+            mask_rect = self._damage_rect(self.current_mask, rect)
+            damage = damage.united(mask_rect)
+            if mask_rect.intersects(dirty):
+                painter.setRenderHint(
+                    antialiasing,
+                    not isinstance(self.current_mask, BoundingBox))
+                self.current_mask.draw(painter, img_w, img_h, widget_w,
+                                       widget_h, rect, self._live_pen)
+
+        self._last_damage = damage
+        # every mask add/remove ends in a repaint, so this is the one place
+        # that sees them all; no masks means no animation ticks at all
+        self._set_dash_running(not damage.isEmpty())
 
         # Draw selection feedback points (highlight active vertex if any)
-        if self.selected_mask:
-            # default color for points
-            self.selected_mask.draw_points(painter, img_w, img_h, widget_w,
-                                           widget_h, rect,
-                                           active_index=self.active_vertex_index,
-                                           color=self.selected_color)
-
-            # if active vertex exists draw additional highlight circle
-            if self.active_vertex_index is not None:
-                # draw a stronger highlight circle using MOVING_POINT_COLOR
-                self.selected_mask.draw_points(painter, img_w, img_h, widget_w,
-                                               widget_h, rect,
-                                               active_index=self.active_vertex_index,
-                                               color=MOVING_POINT_COLOR)
+        if self.selected_mask and (self.dragging or self.dragging_vertex):
+            # markers move every frame of a drag: a cached layer would be
+            # reallocated each time, so draw them directly
+            if self._damage_rect(self.selected_mask, rect).intersects(dirty):
+                painter.setRenderHint(antialiasing, True)
+                self._draw_selection_points(painter, img_w, img_h, widget_w,
+                                            widget_h, rect)
+        elif self.selected_mask:
+            self._ensure_static_layer(img_w, img_h, widget_w, widget_h, rect)
+            if self._static_rect.intersects(dirty):
+                painter.drawPixmap(self._static_rect.topLeft(),
+                                   self._static_pixmap)
 
     # -----------------------------
     # Undo / Redo / Clear
     # -----------------------------
     def undo(self):
         self.main_window.document.undo()
-        self.update()
+        self.shapes_changed()
 
     def redo(self):
         if self.main_window.document.redo():
-            self.update()
+            self.shapes_changed()
 
     def clear_shapes(self):
         reply = QMessageBox.question(
@@ -392,4 +690,4 @@ class OverlayWidget(QWidget):
         )
         if reply == QMessageBox.StandardButton.Ok:
             self.main_window.document.clear()
-        self.update()
+        self.shapes_changed()
@@ -1,51 +1,109 @@
-from dataclasses_json import dataclass_json
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses_json import dataclass_json, config
+from dataclasses import dataclass, field
 
 import numpy as np
 from scipy.interpolate import splprep, splev
 from shapely.geometry import LineString
 from shapely.ops import unary_union
 
-from PySide6.QtCore import QRectF, Qt
-from PySide6.QtGui import QPainter, QPen, QPolygonF, QColor
+from PySide6.QtCore import QRectF, QPointF, Qt
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QPolygonF, QColor
 
 from app.computational_geometry.coordinates_convertion import \
-    image_to_widget_coords
+    normalized_to_widget_transform
+from app.computational_geometry.polygon_geometry import shoelace_and_bbox
 from app.ui.vector_masks import VectorMask, register_vector_mask_object
 
 
+def _as_points_array(points) -> np.ndarray:
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
 @register_vector_mask_object
 @dataclass_json
 @dataclass
 class PolygonShape(VectorMask):
-    points: List[Tuple[float, float]]
+    # (N, 2) float64 array of normalized (x, y) vertices
+    points: np.ndarray = field(
+        metadata=config(encoder=lambda pts: pts.tolist(),
+                        decoder=_as_points_array))
     id: str
     ts: int  # timestamp
 
     def __post_init__(self):
         self.selected = False
-
-    def get_points(self) -> List[Tuple[float, float]]:
+        # vertices appended while drawing, see update()
+        self._live_points: list | None = None
+
+    def __setattr__(self, name, value):
+        # points are always stored as an (N, 2) array; any reassignment also
+        # invalidates the cached QPolygonF
+        if name == "points":
+            value = _as_points_array(value)
+            object.__setattr__(self, "_qpolygon", None)
+        object.__setattr__(self, name, value)
+
+    # masks are entities: compare by identity (points is an ndarray)
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = object.__hash__
+
+    def qpolygon(self) -> QPolygonF:
+        """Points as a QPolygonF in normalized coordinates, built once per
+        edit instead of on every repaint."""
+        if self._qpolygon is None:
+            self._qpolygon = QPolygonF(
+                [QPointF(x, y) for x, y in self.points.tolist()])
+        return self._qpolygon
+
+    def get_points(self) -> np.ndarray:
         return self.points
 
+    def bounding_rect(self, rect: QRectF) -> QRectF:
+        return normalized_to_widget_transform(rect).mapRect(
+            self.qpolygon().boundingRect())
+
     def draw(self, painter: QPainter,
              img_w: int, img_h: int, widget_w: int, widget_h: int,
              rect: QRectF, pen: QPen):
-        pts = [image_to_widget_coords(
-            x * img_w, y * img_h,
-            img_w, img_h, widget_w, widget_h, rect)
-            for x, y in self.points]
-        if len(pts) >= 3:
+        # the cached polygon also covers vertices still being drawn
+        if self.qpolygon().size() >= 3:
             painter.setPen(pen)
             painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawPolygon(QPolygonF(pts))
+            painter.drawPolygon(
+                normalized_to_widget_transform(rect).map(self.qpolygon()))
+
+    def add_to_path(self, path: QPainterPath, rect: QRectF):
+        if len(self.points) < 3:
+            return
+        path.addPolygon(
+            normalized_to_widget_transform(rect).map(self.qpolygon()))
+        path.closeSubpath()
 
     def update(self, x_img_norm: float, y_img_norm: float):
-        """Append new vertex if it is far enough from the last one."""
-        last_x, last_y = self.points[-1]
+        """Append new vertex if it is far enough from the last one.
+
+        While drawing, vertices go to a plain list and to the cached
+        QPolygonF used for painting, both O(1) per vertex; finish_drawing()
+        converts them to the points array once.
+        """
+        live = self._live_points
+        if live is None:
+            live = self._live_points = self.points.tolist()
+        last_x, last_y = live[-1]
         if abs(last_x - x_img_norm) > 0.002 or abs(last_y - y_img_norm) > 0.002:
-            self.points.append((x_img_norm, y_img_norm))
+            live.append((x_img_norm, y_img_norm))
+            # a mask being drawn is not in the document yet, so this
+            # polygon is not shared with any snapshot
+            self.qpolygon().append(QPointF(x_img_norm, y_img_norm))
+
+    def finish_drawing(self):
+        if self._live_points is not None:
+            # reassigning points drops the live polygon; the finished mask
+            # builds its own on first paint
+            self.points = self._live_points
+            self._live_points = None
 
     def smooth(self, image_width: int, image_height: int,
                screen_width_mm: float = None, screen_height_mm: float = None,
@@ -61,8 +119,7 @@ class PolygonShape(VectorMask):
             return
 
         # Convert normalized points to absolute pixels
-        pts_px = np.array(
-            [(x * image_width, y * image_height) for x, y in self.points])
+        pts_px = self.points * (image_width, image_height)
         x, y = pts_px[:, 0], pts_px[:, 1]
 
         # Convert to screen mm
@@ -78,8 +135,6 @@ class PolygonShape(VectorMask):
         try:
             tck, _ = splprep([x_closed, y_closed], s=0, per=True)
         except Exception:
-            self.points = [(xi / image_width, yi / image_height) for xi, yi in
-                           zip(x, y)]
             return
 
         # Evaluate spline densely
@@ -111,18 +166,12 @@ class PolygonShape(VectorMask):
                 new_pts_mm.append(pt)
 
         # Convert back to normalized coordinates
-        self.points = [
-            (x_mm / scale_x / image_width, y_mm / scale_y / image_height)
-            for x_mm, y_mm in new_pts_mm]
+        self.points = np.asarray(new_pts_mm, dtype=np.float64) / (
+            scale_x * image_width, scale_y * image_height)
 
     def move(self, dx: float, dy: float):
         """Move polygon in normalized coordinates, clamped inside [0,1]."""
-        new_points = []
-        for x, y in self.points:
-            nx = min(max(x + dx, 0.0), 1.0)
-            ny = min(max(y + dy, 0.0), 1.0)
-            new_points.append((nx, ny))
-        self.points = new_points
+        self.points = np.clip(self.points + (dx, dy), 0.0, 1.0)
 
     def move_point(self, index: int, nx: float, ny: float) -> None:
         """Move single vertex at `index` to normalized coords (nx,ny)."""
@@ -130,7 +179,7 @@ class PolygonShape(VectorMask):
             return
         nx = min(max(nx, 0.0), 1.0)
         ny = min(max(ny, 0.0), 1.0)
-        pts = list(self.points)
+        pts = self.points.copy()
         pts[index] = (nx, ny)
         self.points = pts
 
@@ -140,31 +189,24 @@ class PolygonShape(VectorMask):
             return False
         if index < 0 or index >= len(self.points):
             return False
-        pts = list(self.points)
-        pts.pop(index)
-        self.points = pts
+        self.points = np.delete(self.points, index, axis=0)
         return True
 
     def contains(self, nx: float, ny: float) -> bool:
         """Ray casting point-in-polygon check in normalized coords."""
-        inside = False
-        pts = self.points
-        j = len(pts) - 1
-        for i in range(len(pts)):
-            xi, yi = pts[i]
-            xj, yj = pts[j]
-            if ((yi > ny) != (yj > ny)) and \
-                (nx < (xj - xi) * (ny - yi) / (yj - yi + 1e-9) + xi):
-                inside = not inside
-            j = i
-        return inside
+        xi, yi = self.points[:, 0], self.points[:, 1]
+        # edge i joins vertex i-1 (xj, yj) to vertex i (xi, yi)
+        xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+        crosses = (yi > ny) != (yj > ny)
+        x_cross = (xj - xi) * (ny - yi) / (yj - yi + 1e-9) + xi
+        return bool(np.count_nonzero(crosses & (nx < x_cross)) % 2)
 
     def draw_points(self, painter, img_w, img_h, widget_w, widget_h, rect,
                     active_index: int | None = None,
                     color=QColor(180, 180, 180)):
         pen = QPen(color, 2)
         painter.setPen(pen)
-        for idx, (nx, ny) in enumerate(self.points):
+        for idx, (nx, ny) in enumerate(self.points.tolist()):
             px = rect.left() + nx * rect.width()
             py = rect.top() + ny * rect.height()
             if active_index is not None and idx == active_index:
@@ -174,22 +216,15 @@ class PolygonShape(VectorMask):
 
     def export_to_coco(self, image_id: int, ann_id: int, image_w: int,
                        image_h: int) -> dict:
-        abs_points = []
-        for x, y in self.points:
-            abs_points.extend([x * image_w, y * image_h])
+        # (N, 2) array of absolute pixel coords, scaled in a single op
+        abs_pts = self.points * (image_w, image_h)
+        area, min_x, min_y, max_x, max_y = shoelace_and_bbox(abs_pts)
         return {
             "id": ann_id,
             "image_id": image_id,
             "category_id": 1,  # or map from self.id
-            "segmentation": [abs_points],
-            "area": 0,  # polygon area can be computed if needed
-            "bbox": self._compute_bbox(image_w, image_h),
+            "segmentation": [abs_pts.ravel().tolist()],
+            "area": abs(area),
+            "bbox": [min_x, min_y, max_x - min_x, max_y - min_y],
             "iscrowd": 0,
         }
-
-    def _compute_bbox(self, image_w, image_h):
-        xs = [x * image_w for x, _ in self.points]
-        ys = [y * image_h for _, y in self.points]
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-        return [min_x, min_y, max_x - min_x, max_y - min_y]
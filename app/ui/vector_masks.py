@@ -5,8 +5,8 @@ from abc import ABC, abstractmethod
 
 from dataclasses import dataclass
 
-from PySide6.QtCore import QRectF
-from PySide6.QtGui import QPainter, QPen, QColor
+from PySide6.QtCore import QRectF, QPointF
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QColor
 from dataclasses_json import dataclass_json
 
 
@@ -16,17 +16,19 @@ class VectorMask(ABC):
 
     @classmethod
     def create(cls, mask_type: str, x: float = 0.0,
-               y: float = 0.0) -> 'VectorMask':
+               y: float = 0.0, mask_id: str | None = None) -> 'VectorMask':
         """
         Factory method to create a new VectorMask subclass instance.
         Args:
             mask_type: 'box' or 'poly'
             x, y: starting normalized coordinates
+            mask_id: ID to assign (see ThyraDocument.new_mask_id);
+                a random UUID if omitted
         Returns:
             Instance of BoundingBox or PolygonShape
         """
         ts = int(datetime.now().timestamp())
-        new_id = str(uuid.uuid4())
+        new_id = mask_id if mask_id is not None else str(uuid.uuid4())
         if mask_type == "box":
             from app.ui.bounding_box import BoundingBox
             return BoundingBox(x=x, y=y, w=0.0, h=0.0, id=new_id, ts=ts)
@@ -41,6 +43,25 @@ class VectorMask(ABC):
         """Return a list of normalized (x,y) points defining the mask."""
         pass
 
+    def bounding_rect(self, rect: QRectF) -> QRectF:
+        """Bounding rectangle of the mask in widget coordinates, given the
+        video rect the normalized points are mapped into."""
+        pts = self.get_points()
+        if not pts:
+            return QRectF()
+        xs = [x for x, _ in pts]
+        ys = [y for _, y in pts]
+        return QRectF(
+            QPointF(rect.left() + min(xs) * rect.width(),
+                    rect.top() + min(ys) * rect.height()),
+            QPointF(rect.left() + max(xs) * rect.width(),
+                    rect.top() + max(ys) * rect.height()))
+
+    @abstractmethod
+    def add_to_path(self, path: QPainterPath, rect: QRectF):
+        """Append the mask outline, in widget coordinates, to `path`."""
+        raise NotImplementedError
+
     @abstractmethod
     def draw(self, painter: QPainter,
              img_w: int, img_h: int, widget_w: int, widget_h: int,
@@ -51,6 +72,11 @@ class VectorMask(ABC):
         """Update the mask using the current mouse position (normalized coordinates)."""
         raise NotImplementedError
 
+    def finish_drawing(self):
+        """Called once when live drawing of the mask ends (mouse release),
+        before it is added to the document."""
+        pass
+
     @abstractmethod
     def smooth(self, image_width: int, image_height: int,
                screen_width_mm: float = None, screen_height_mm: float = None,
@@ -8,14 +8,30 @@ class VideoWidget(QOpenGLWidget):
         super().__init__(parent)
         self.setMinimumSize(320, 240)
         self.setAutoFillBackground(False)
-        self.image: QtGui.QImage | None = None
+        self._image: QtGui.QImage | None = None
+        # The GL paint engine caches uploaded textures by QPixmap.cacheKey(),
+        # so keeping one pixmap per image means a single CPU->GPU upload
+        # instead of one per repaint.
+        self._pixmap: QtGui.QPixmap | None = None
+
+    @property
+    def image(self) -> QtGui.QImage | None:
+        return self._image
+
+    @image.setter
+    def image(self, img: QtGui.QImage | None):
+        self._image = img
+        self._pixmap = None
 
     def paintEvent(self, event):
         super().paintEvent(event)
-        if self.image:
+        if self._image:
+            if self._pixmap is None:
+                self._pixmap = QtGui.QPixmap.fromImage(self._image)
+            pixmap = self._pixmap
+
             painter = QtGui.QPainter(self)
             painter.setRenderHint(QtGui.QPainter.RenderHint.SmoothPixmapTransform)
-            pixmap = QtGui.QPixmap.fromImage(self.image)
 
             widget_w = self.width()
             widget_h = self.height()
@@ -39,4 +55,4 @@ class VideoWidget(QOpenGLWidget):
                 y_offset = int((widget_h - height) / 2)
 
             target_rect = QtCore.QRect(x_offset, y_offset, width, height)
-            painter.drawPixmap(target_rect, pixmap)
\ No newline at end of file
+            painter.drawPixmap(target_rect, pixmap)
@@ -0,0 +1,37 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from app.thyra_document import ThyraDocument
+
+
+class CocoExporterSignals(QObject):
+    """Signals emitted by CocoExporter (QRunnable is not a QObject)."""
+    # path of the written COCO file
+    finished = Signal(str)
+    # error message
+    failed = Signal(str)
+
+
+class CocoExporter(QRunnable):
+    """Serialize a document snapshot to COCO JSON off the GUI thread.
+
+    The document must be a snapshot (see ThyraDocument.snapshot) so mouse
+    edits on the live masks cannot change it while it is being written.
+    """
+
+    def __init__(self, document: ThyraDocument, image_width: int,
+                 image_height: int, document_file_path: str):
+        super().__init__()
+        self.document = document
+        self.image_width = image_width
+        self.image_height = image_height
+        self.document_file_path = document_file_path
+        self.signals = CocoExporterSignals()
+
+    def run(self):
+        try:
+            out_path = self.document.export_to_coco(
+                self.image_width, self.image_height, self.document_file_path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(out_path)
@@ -0,0 +1,56 @@
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader
+
+
+class ImageLoaderSignals(QObject):
+    """Signals emitted by ImageLoader (QRunnable is not a QObject)."""
+    # path, decoded image, source width, source height
+    loaded = Signal(str, QImage, int, int)
+    # path, error message
+    failed = Signal(str, str)
+
+
+class ImageLoader(QRunnable):
+    """Decode an image file off the GUI thread.
+
+    Only the resolution needed for display is decoded: when `target_size` is
+    smaller than the source, QImageReader scales while decoding. The source
+    dimensions are reported separately because normalized mask coordinates
+    and COCO export refer to the original image size.
+    """
+
+    def __init__(self, path: str, target_size: QSize | None = None):
+        super().__init__()
+        self.path = path
+        self.target_size = target_size
+        self.signals = ImageLoaderSignals()
+
+    def run(self):
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+
+        src_size = reader.size()
+        rotated = bool(reader.transformation()
+                       & QImageIOHandler.Transformation.TransformationRotate90)
+        if src_size.isValid() and self.target_size is not None \
+                and not self.target_size.isEmpty():
+            # scaledSize applies before the EXIF transform
+            target = self.target_size.transposed() if rotated \
+                else self.target_size
+            if src_size.width() > target.width() \
+                    or src_size.height() > target.height():
+                reader.setScaledSize(src_size.scaled(
+                    target, Qt.AspectRatioMode.KeepAspectRatio))
+
+        img = reader.read()
+        if img.isNull():
+            self.signals.failed.emit(self.path, reader.errorString())
+            return
+
+        if src_size.isValid():
+            width, height = src_size.width(), src_size.height()
+            if rotated:
+                width, height = height, width
+        else:
+            width, height = img.width(), img.height()
+        self.signals.loaded.emit(self.path, img, width, height)
@@ -0,0 +1,11 @@
+#!/usr/bin/env bash
+set -e
+
+# Optional: compile the Cython polygon kernel in place
+# (app/computational_geometry/_geom*.so). Without it the app uses Numba or NumPy.
+#pip install cython
+
+cd "$(dirname "$0")/.."
+cythonize -i -3 app/computational_geometry/_geom.pyx
+
+echo "Built app/computational_geometry/_geom extension."